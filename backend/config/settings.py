@@ -12,6 +12,12 @@ class Settings:
     MONGODB_URI: str = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
     DB_NAME: str = os.getenv("DB_NAME", "tax_helper_db")
     print(DB_NAME)
+    # Motor connection pool; async I/O needs far fewer sockets than a threaded driver
+    MONGODB_MAX_POOL_SIZE: int = int(os.getenv("MONGODB_MAX_POOL_SIZE", "50"))
+    MONGODB_MIN_POOL_SIZE: int = int(os.getenv("MONGODB_MIN_POOL_SIZE", "5"))
+    MONGODB_MAX_IDLE_TIME_MS: int = int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "30000"))
+    # Wire compression for large chat_history documents (zstd needs the 'zstandard' package)
+    MONGODB_COMPRESSORS: str = os.getenv("MONGODB_COMPRESSORS", "zstd")
 
     # Google API Key for LLM
     GOOGLE_API_KEY: str = os.getenv("GOOGLE_API_KEY")
@@ -19,6 +25,15 @@ class Settings:
     # LLM Model Configuration
     LLM_CHATBOT_MODEL: str = "gemini-2.0-flash"
     LLM_TEMPERATURE: float = 0.5
+    # Max in-flight chatbot/graph LLM requests per process; size it to the Gemini QPM quota
+    LLM_CONCURRENCY: int = int(os.getenv("LLM_CONCURRENCY", "8"))
+
+    # Semantic response cache for chatbot replies
+    SEMANTIC_CACHE_THRESHOLD: float = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+    SEMANTIC_CACHE_TTL_SECONDS: int = int(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "3600"))
+
+    # Exact-match cache for initial tax verdicts
+    LLM_CACHE_TTL_SECONDS: int = int(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
 
     def __init__(self):
         if not self.MONGODB_URI:
@@ -2,7 +2,7 @@
 import traceback
 from typing import List
 from fastapi import APIRouter, Depends, status, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 
 from models.chat_message_model import (
     InitialTaxDetailsInput,
@@ -63,10 +63,36 @@ async def send_message_to_chat_route(
 ):
     """Sends a new user message to an ongoing chat session and receives an AI response."""
     try:
-        return await chat_service.send_message_to_chat(session_id, input_data, user_id)
+        result = await chat_service.send_message_to_chat(session_id, input_data, user_id)
+        # Serialized directly: returning the model would make FastAPI re-validate the
+        # full chat history against response_model, which stays for the OpenAPI schema
+        return Response(content=result.model_dump_json(), media_type="application/json")
     except HTTPException:
         raise # Re-raise FastAPI HTTPExceptions
     except Exception as e:
         print(f"An unexpected error occurred during message sending: {e}")
         traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Internal server error: {e}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Internal server error: {e}")
+
+@router.post(
+    "/chats/{session_id}/send_message/stream",
+    summary="Send a new message and stream the AI response as Server-Sent Events"
+)
+async def stream_message_to_chat_route(
+    session_id: str,
+    input_data: ChatMessageInput,
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Streams the assistant's reply token by token as 'data' events, followed by a final
+    'done' event carrying the session's awaiting_human_input status.
+    """
+    try:
+        event_stream = await chat_service.stream_message_to_chat(session_id, input_data, user_id)
+    except HTTPException:
+        raise # Re-raise FastAPI HTTPExceptions
+    except Exception as e:
+        print(f"An unexpected error occurred during message streaming: {e}")
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Internal server error: {e}")
+    return StreamingResponse(event_stream, media_type="text/event-stream")
@@ -2,7 +2,7 @@
 
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from pymongo.errors import PyMongoError
 from services.chat_service import ChatService, chat_service
 
@@ -28,7 +28,8 @@ except ImportError as e:
 app = FastAPI(
     title="Unified Tax & Chatbot API",
     description="All-in-one backend with tax deduction summary + chatbot with sessions.",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # ─── CORS Configuration ─────────────────────────────────────────
@@ -78,3 +79,9 @@ async def health_check():
 app.include_router(tax_router, prefix="/tax", tags=["Tax"])
 app.include_router(auth_controller.router, tags=["Authentication"])
 app.include_router(chat_controller.router, tags=["Chat Sessions"])
+
+# ─── Local Entry Point ─────────────────────────────────────────
+if __name__ == "__main__":
+    import uvicorn
+    # uvloop replaces the default asyncio event loop for lower per-request overhead
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, loop="uvloop")
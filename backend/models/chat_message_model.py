@@ -1,29 +1,37 @@
 # ─── Pydantic Models for Request/Response Validation ──────────────────────────
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, ConfigDict, Field, EmailStr
 from typing import Any, Dict, List, Optional
-from datetime import datetime
+from datetime import datetime, timezone
 
 
 class UserCreate(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     username: str
     email: EmailStr
     password: str
 
 class UserLogin(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     username: str
     password: str
 
 class InitialTaxDetailsInput(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     user_details: Dict[str, Any]
 
 class ChatMessageInput(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     message: str
     is_interruption_response: bool = Field(False, description="Set to true if this message is a response to a human-in-the-loop interruption.")
 
 class ChatMessage(BaseModel):
     role: str
     content: str
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     tool_call_id: Optional[str] = None
 class ChatSessionResponse(BaseModel):
     # Changed from Field(alias="_id") to just 'id'
@@ -12,10 +12,12 @@
 #     otherDeductions: Dict[str, DeductionField]
 #     housingDetails: Dict[str, str]
 #     miscellaneous: Dict[str, str]
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Any, Literal, Dict
 
 
 
 class TaxFormRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     user_details: Dict[str, Any]
@@ -0,0 +1,51 @@
+# backend/rag_pipeline/cached_embedder.py
+from collections import OrderedDict
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+
+class AsyncLRUEmbedder(Embeddings):
+    """
+    Wraps an Embeddings model with an in-process LRU cache of query embeddings.
+
+    Repeated query text (chat retries, double-submits, the semantic cache and the
+    retrievers embedding the same message) is served without another API round-trip.
+    Document embeddings are passed straight through since ingestion rarely repeats text.
+    """
+
+    def __init__(self, embedder: Embeddings, max_size: int = 2048):
+        self.embedder = embedder
+        self.max_size = max_size
+        self._cache: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    def _get(self, text: str):
+        vector = self._cache.get(text)
+        if vector is not None:
+            self._cache.move_to_end(text)
+        return vector
+
+    def _put(self, text: str, vector: List[float]) -> None:
+        self._cache[text] = vector
+        if len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = self._get(text)
+        if vector is None:
+            vector = self.embedder.embed_query(text)
+            self._put(text, vector)
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        vector = self._get(text)
+        if vector is None:
+            vector = await self.embedder.aembed_query(text)
+            self._put(text, vector)
+        return vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embedder.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.embedder.aembed_documents(texts)
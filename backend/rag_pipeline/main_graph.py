@@ -19,6 +19,7 @@ from langchain_core.messages import ToolMessage, HumanMessage, AIMessage, ToolCa
 from langchain_core.output_parsers import StrOutputParser
 from langgraph.types import interrupt
 from .tax_deductions import TaxCalculator 
+from .cached_embedder import AsyncLRUEmbedder
 
 load_dotenv()
 
@@ -203,7 +204,8 @@ parse_human_input_chain = (
 )
 
 # ─── BUILD MULTI-COLLECTION RETRIEVER (Async Version) ──────────────────────────
-embedder = GoogleGenerativeAIEmbeddings(model=EMBEDDING_MODEL)
+# Query embeddings are memoized; the semantic cache and every retriever share this instance
+embedder = AsyncLRUEmbedder(GoogleGenerativeAIEmbeddings(model=EMBEDDING_MODEL))
 
 # Initialize Qdrant clients with async capability
 retrievers = {
@@ -630,7 +632,7 @@ async def rag_node(state: TaxState) -> dict:
 
     return {"rag_results": rag_results, "messages": [AIMessage(content="Retrieved relevant legal contexts.")]}
 
-def reason_node(state: TaxState) -> dict:
+async def reason_node(state: TaxState) -> dict:
     """
     Reason whether the deduction applies, using specific calculation functions
     from TaxCalculator if available, otherwise falling back to LLM reasoning.
@@ -642,6 +644,10 @@ def reason_node(state: TaxState) -> dict:
     rag_results = state["rag_results"]
     reasoning = {}
 
+    # LLM fallbacks are independent of each other, so they are collected and run concurrently
+    llm_tasks = []
+    llm_deduction_names = []
+
     # Instantiate your TaxCalculator with the user's details
     calculator = TaxCalculator(user_details)
 
@@ -698,20 +704,32 @@ def reason_node(state: TaxState) -> dict:
             # Fallback to LLM for non-calculator deductions or complex cases
             print(f"LLM reasoning for: {name} (no specific function or for augmentation)")
             contexts = "\n----\n".join(rag_results.get(name, []))
-            resp = reason_chain.invoke(
+            llm_tasks.append(reason_chain.ainvoke(
                 {
                     "deduction": name,
                     "user_facts": json.dumps(user_details),
                     "contexts": contexts,
                 }
-            )
-            if isinstance(resp, str):
-                try:
-                    result = json.loads(resp)
-                except json.JSONDecodeError:
-                    result = {"amount": "Error", "summary": f"Could not parse LLM response for {name}: {resp}", "citations": []}
-            else:
-                result = resp
+            ))
+            llm_deduction_names.append(name)
+            reasoning[name] = None # Placeholder keeps the deduction plan order
+            continue
+
+        if result:
+            reasoning[name] = result
+        else:
+            reasoning[name] = {"amount": "N/A", "summary": "Could not determine deduction.", "citations": []}
+
+    llm_responses = await asyncio.gather(*llm_tasks)
+
+    for name, resp in zip(llm_deduction_names, llm_responses):
+        if isinstance(resp, str):
+            try:
+                result = json.loads(resp)
+            except json.JSONDecodeError:
+                result = {"amount": "Error", "summary": f"Could not parse LLM response for {name}: {resp}", "citations": []}
+        else:
+            result = resp
 
         if result:
             reasoning[name] = result
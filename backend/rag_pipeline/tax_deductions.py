@@ -1,5 +1,81 @@
 import json
-from typing import Any, Dict, List
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List
+
+from utils.string_utils import ascii_lower, to_bool
+
+# Citation tuples are shared by every result dict instead of being rebuilt per call
+_CIT_16IA = ("Section 16(ia)",)
+_CIT_80C = ("Section 80C",)
+_CIT_80D = ("Section 80D",)
+_CIT_24B = ("Section 24(b)",)
+_CIT_80G = ("Section 80G",)
+_CIT_80G_AGTI = ("Section 80G", "Section 80G(4)", "Section 80G(5)")
+_CIT_80CCD1B = ("Section 80CCD(1B)",)
+_CIT_80E = ("Section 80E",)
+_CIT_80DD = ("Section 80DD",)
+_CIT_80DD_NORMAL = ("Section 80DD", "Section 80DD(1)")
+_CIT_80DD_SEVERE = ("Section 80DD", "Section 80DD(2)")
+_CIT_80TTA = ("Section 80TTA",)
+_CIT_80TTB = ("Section 80TTB",)
+
+# --- Income tax slabs for AY 2025-26 ---
+def _slab_tax_fn(uppers, lowers, bases, rates, rebate_limit=None, rebate=0) -> Callable[[float], float]:
+    """
+    Builds a tax function for one slab table. Income in (lowers[i], uppers[i]] pays
+    bases[i] + (income - lowers[i]) * rates[i]; the Section 87A rebate is applied up to rebate_limit.
+    """
+    def tax_fn(taxable_income: float) -> float:
+        i = bisect_left(uppers, taxable_income)
+        tax_due = bases[i] + (taxable_income - lowers[i]) * rates[i]
+        if rebate_limit is not None and taxable_income <= rebate_limit:
+            tax_due = max(0, tax_due - rebate)
+        return tax_due
+    return tax_fn
+
+# New Tax Regime (effective from FY 2023-24); standard deduction is assumed to be applied already.
+# Rebate under Section 87A of up to ₹25,000 for income up to ₹7 Lakhs.
+_new_regime_fn = _slab_tax_fn(
+    uppers=(300000, 600000, 900000, 1200000, 1500000),
+    lowers=(0, 300000, 600000, 900000, 1200000, 1500000),
+    bases=(0, 0, 15000, 45000, 90000, 150000),
+    rates=(0, 0.05, 0.10, 0.15, 0.20, 0.30),
+    rebate_limit=700000, rebate=25000,
+)
+# Old Tax Regime, individuals below 60 years. Rebate of up to ₹12,500 for income up to ₹5 Lakhs.
+_old_under60_fn = _slab_tax_fn(
+    uppers=(250000, 500000, 1000000),
+    lowers=(0, 250000, 500000, 1000000),
+    bases=(0, 0, 12500, 112500),
+    rates=(0, 0.05, 0.20, 0.30),
+    rebate_limit=500000, rebate=12500,
+)
+# Old Tax Regime, senior citizens (60 to less than 80 years).
+_old_senior_fn = _slab_tax_fn(
+    uppers=(300000, 500000, 1000000),
+    lowers=(0, 300000, 500000, 1000000),
+    bases=(0, 0, 10000, 110000),
+    rates=(0, 0.05, 0.20, 0.30),
+    rebate_limit=500000, rebate=12500,
+)
+# Old Tax Regime, super senior citizens (80 years and above).
+# Section 87A rebate not applicable as their basic exemption is already ₹5 Lakhs.
+_old_super_senior_fn = _slab_tax_fn(
+    uppers=(500000, 1000000),
+    lowers=(0, 500000, 1000000),
+    bases=(0, 0, 100000),
+    rates=(0, 0.20, 0.30),
+)
+
+def _make_tax_fn(tax_regime: str, user_age: int) -> Callable[[float], float]:
+    """Picks the slab function for a regime and age band (before cess)."""
+    if tax_regime == "new":
+        return _new_regime_fn
+    if user_age < 60:
+        return _old_under60_fn
+    if user_age < 80:
+        return _old_senior_fn
+    return _old_super_senior_fn
 
 class TaxCalculator:
     """
@@ -37,7 +113,9 @@ class TaxCalculator:
         
         # Normalize senior citizen status (string to boolean if applicable)
         if isinstance(self.user_details.get('is_senior_citizen'), str):
-            self.user_details['is_senior_citizen'] = self.user_details['is_senior_citizen'].lower() == 'true'
+            self.user_details['is_senior_citizen'] = to_bool(self.user_details['is_senior_citizen'])
+
+        self._tax_fn = None # Resolved by calculate_tax_liability on first use
 
     def calculate_standard_deduction(self, tax_regime: str = "old") -> Dict[str, Any]:
         """
@@ -46,7 +124,7 @@ class TaxCalculator:
         salary = self.user_details.get("salary", 0)
         deduction_amount = 0
         summary = ""
-        citations = ["Section 16(ia)"]
+        citations = _CIT_16IA
 
         # For FY 2024-25 (AY 2025-26), standard deduction is generally Rs. 50,000
         # for salaried individuals, regardless of old or new tax regime for most cases.
@@ -81,7 +159,7 @@ class TaxCalculator:
         return {
             "amount": f"₹{deduction_amount:,}",
             "summary": summary,
-            "citations": ["Section 80C"],
+            "citations": _CIT_80C,
         }
 
     def calculate_section_80D_deduction(self) -> Dict[str, Any]:
@@ -93,10 +171,11 @@ class TaxCalculator:
         medical_expenses = self.user_details.get("medical_expenses", 0) # Could be general medical expenses or preventive checkups
         age_self = self.user_details.get("age_self", 0)
         age_parents = self.user_details.get("parents_age", 0)
+        medical_expenses_remaining = medical_expenses # Reduced by whatever the self/family block consumes
 
         total_80D_deduction = 0
         summary_parts = []
-        citations = ["Section 80D"]
+        citations = _CIT_80D
 
         # Part 1: Self, Spouse, Dependent Children
         # If user is senior citizen, the limit is higher (50k for premium + medical).
@@ -141,9 +220,9 @@ class TaxCalculator:
         # Any remaining medical expenses from user_details could be for parents if applicable (assuming not part of premium)
         deductible_parents_medical = 0
         if age_parents >= 60: # For senior citizen parents, general medical expenses covered under 50k
-             deductible_parents_medical = min(medical_expenses_remaining if 'medical_expenses_remaining' in locals() else medical_expenses, remaining_parents_limit)
+             deductible_parents_medical = min(medical_expenses_remaining, remaining_parents_limit)
         else: # For non-senior parents, only preventive checkup if separate, or within 25k limit
-            deductible_parents_medical = min(medical_expenses_remaining if 'medical_expenses_remaining' in locals() else medical_expenses, self.SECTION_80D_PREVENTIVE_HEALTH_CHECKUP_LIMIT, remaining_parents_limit)
+            deductible_parents_medical = min(medical_expenses_remaining, self.SECTION_80D_PREVENTIVE_HEALTH_CHECKUP_LIMIT, remaining_parents_limit)
 
         section_80D_parents = deductible_parents_premium + deductible_parents_medical
         section_80D_parents = min(section_80D_parents, limit_parents) # Final cap
@@ -174,11 +253,11 @@ class TaxCalculator:
         Calculates deduction for interest on housing loan under Section 24(b).
         """
         housing_loan_interest = self.user_details.get("housing_loan_interest", 0)
-        property_status = self.user_details.get("property_status", "").lower()
+        property_status = ascii_lower(self.user_details.get("property_status", ""))
 
         deduction_amount = 0
         summary = ""
-        citations = ["Section 24(b)"]
+        citations = _CIT_24B
 
         if property_status == "self_occupied":
             deduction_amount = min(housing_loan_interest, self.SECTION_24B_SELF_OCCUPIED_LIMIT)
@@ -211,7 +290,7 @@ class TaxCalculator:
 
         deduction_amount = 0
         summary = "No deduction under Section 80G."
-        citations = ["Section 80G"]
+        citations = _CIT_80G
 
         if donation_amount > 0:
             # Assuming donation is to a qualifying institution and is eligible for 100% or 50% without AGTI limit for simplicity,
@@ -226,7 +305,7 @@ class TaxCalculator:
                 f"However, note that certain donations under Section 80G are subject to a limit of 10% "
                 f"of Adjusted Gross Total Income (AGTI), which requires calculating all other deductions first."
             )
-            citations.extend(["Section 80G(4)", "Section 80G(5)"])
+            citations = _CIT_80G_AGTI
         
         return {
             "amount": f"₹{deduction_amount:,}",
@@ -249,7 +328,7 @@ class TaxCalculator:
         return {
             "amount": f"₹{deduction_amount:,}",
             "summary": summary,
-            "citations": ["Section 80CCD(1B)"],
+            "citations": _CIT_80CCD1B,
         }
 
     def calculate_section_80E_deduction(self) -> Dict[str, Any]:
@@ -267,7 +346,7 @@ class TaxCalculator:
         return {
             "amount": f"₹{deduction_amount:,}",
             "summary": summary,
-            "citations": ["Section 80E"],
+            "citations": _CIT_80E,
         }
 
     def calculate_section_80DD_deduction(self) -> Dict[str, Any]:
@@ -279,17 +358,17 @@ class TaxCalculator:
 
         deduction_amount = 0
         summary = "No deduction under Section 80DD as no dependent with disability is indicated in user details."
-        citations = ["Section 80DD"]
+        citations = _CIT_80DD
 
         if is_disabled == "true": # Assuming 'true' as string from input
             if disability_type == "normal_disability":
                 deduction_amount = 75000
                 summary = "Deduction for normal disability (40% or more but less than 80%) under Section 80DD is ₹75,000."
-                citations.append("Section 80DD(1)")
+                citations = _CIT_80DD_NORMAL
             elif disability_type == "severe_disability":
                 deduction_amount = 125000
                 summary = "Deduction for severe disability (80% or more) under Section 80DD is ₹125,000."
-                citations.append("Section 80DD(2)")
+                citations = _CIT_80DD_SEVERE
             else:
                 summary = "Disability type not specified or recognized for Section 80DD."
         
@@ -309,7 +388,7 @@ class TaxCalculator:
 
         deduction_amount = 0
         summary = ""
-        citations = ["Section 80TTA"]
+        citations = _CIT_80TTA
 
         if age_self < 60: # Not a senior citizen
             deduction_amount = min(interest_from_savings, self.SECTION_80TTA_LIMIT)
@@ -341,7 +420,7 @@ class TaxCalculator:
         
         deduction_amount = 0
         summary = ""
-        citations = ["Section 80TTB"]
+        citations = _CIT_80TTB
 
         if age_self >= 60: # Senior citizen
             deduction_amount = min(total_interest_income, self.SECTION_80TTB_LIMIT)
@@ -376,76 +455,14 @@ class TaxCalculator:
         """
         Calculates the tax liability based on the taxable income for FY 2024-25 (AY 2025-26).
         This implementation covers both Old and New Tax Regimes, considering age for the Old Regime.
+        The slab function for the user's regime and age band is resolved once and reused.
         """
-        tax_regime = self.user_details.get("tax_regime", "old").lower() # Default to old if not specified
-        user_age = self.user_details.get("age_self", 0) # Assumes 'age_self' is available and an integer
-        
-        tax_due = 0.0
-
-        if tax_regime == "new":
-            # New Tax Regime Slabs for AY 2025-26 (effective from FY 2023-24)
-            # Standard deduction of Rs. 50,000 is implicitly handled before passing taxable_income here
-            # or should be handled by an initial reduction in gross income.
-            # Assuming taxable_income already has standard deduction applied if applicable
-            # The new regime also allows a standard deduction for salaried individuals if opted.
-            # However, for simplicity here, we assume standard deduction is already accounted for in taxable_income
-            # if the user opted for the new regime and is eligible.
-            
-            if taxable_income <= 300000:
-                tax_due = 0
-            elif taxable_income <= 600000:
-                tax_due = (taxable_income - 300000) * 0.05
-            elif taxable_income <= 900000:
-                tax_due = 15000 + (taxable_income - 600000) * 0.10
-            elif taxable_income <= 1200000:
-                tax_due = 45000 + (taxable_income - 900000) * 0.15
-            elif taxable_income <= 1500000:
-                tax_due = 90000 + (taxable_income - 1200000) * 0.20
-            else: # Above 15,00,000
-                tax_due = 150000 + (taxable_income - 1500000) * 0.30
-            
-            # Rebate under Section 87A for income up to ₹7 Lakhs (for new regime)
-            if taxable_income <= 700000:
-                tax_due = max(0, tax_due - 25000) # Rebate up to ₹25,000
-            
-        else: # Old Tax Regime Slabs for AY 2025-26
-            if user_age < 60: # Individuals below 60 years (Resident/Non-Resident)
-                if taxable_income <= 250000:
-                    tax_due = 0
-                elif taxable_income <= 500000:
-                    tax_due = (taxable_income - 250000) * 0.05
-                elif taxable_income <= 1000000:
-                    tax_due = 12500 + (taxable_income - 500000) * 0.20
-                else: # Above 10,00,000
-                    tax_due = 112500 + (taxable_income - 1000000) * 0.30
-                
-                # Rebate under Section 87A for income up to ₹5 Lakhs (for old regime)
-                if taxable_income <= 500000:
-                    tax_due = max(0, tax_due - 12500) # Rebate up to ₹12,500
-
-            elif 60 <= user_age < 80: # Senior Citizens (60 to less than 80 years)
-                if taxable_income <= 300000:
-                    tax_due = 0
-                elif taxable_income <= 500000:
-                    tax_due = (taxable_income - 300000) * 0.05
-                elif taxable_income <= 1000000:
-                    tax_due = 10000 + (taxable_income - 500000) * 0.20
-                else: # Above 10,00,000
-                    tax_due = 110000 + (taxable_income - 1000000) * 0.30
-                
-                # Rebate under Section 87A for income up to ₹5 Lakhs (for old regime)
-                if taxable_income <= 500000:
-                    tax_due = max(0, tax_due - 12500)
-
-            else: # Super Senior Citizens (80 years and above)
-                if taxable_income <= 500000:
-                    tax_due = 0
-                elif taxable_income <= 1000000:
-                    tax_due = (taxable_income - 500000) * 0.20
-                else: # Above 10,00,000
-                    tax_due = 100000 + (taxable_income - 1000000) * 0.30
-
-                # Section 87A rebate not applicable for Super Senior Citizens as their basic exemption is already ₹5 Lakhs.
+        if self._tax_fn is None:
+            tax_regime = ascii_lower(self.user_details.get("tax_regime", "old")) # Default to old if not specified
+            user_age = self.user_details.get("age_self", 0) # Assumes 'age_self' is available and an integer
+            self._tax_fn = _make_tax_fn(tax_regime, user_age)
+
+        tax_due = self._tax_fn(taxable_income)
 
         # Add Health and Education Cess @ 4%
         tax_due += tax_due * 0.04
@@ -454,4 +471,4 @@ class TaxCalculator:
         # Surcharge rates vary based on income levels (e.g., 10%, 15%, 25%, 37%).
         # This would require an additional check for income exceeding specific thresholds (e.g., ₹50 Lakhs, ₹1 Crore).
 
-        return tax_due
\ No newline at end of file
+        return tax_due
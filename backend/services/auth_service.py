@@ -1,10 +1,12 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from fastapi import HTTPException, status
-from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 
 from models.chat_message_model import UserCreate, UserLogin
 from services.database_service import db_service
 from utils.password_utils import hash_password, verify_password  # bcrypt helpers
+from utils.string_utils import ascii_lower
+from utils.mongo_utils import oid
 
 class AuthService:
     async def signup_user(self, user_data: UserCreate):
@@ -15,32 +17,38 @@ class AuthService:
         users_collection = db_service.get_user_collection()
 
         # Normalize fields to lowercase
-        username = user_data.username.lower()
-        email = user_data.email.lower()
-
-        # Check for existing username or email
-        existing_user = await users_collection.find_one({
-            "$or": [{"email": email}, {"username": username}]
-        })
-
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="Username or email already registered."
-            )
+        username = ascii_lower(user_data.username)
+        email = ascii_lower(user_data.email)
 
+        # Hashed up front on purpose: the hash has to be part of the single atomic upsert,
+        # and a lookup first to skip bcrypt for taken names would reopen the signup race.
         user_doc = {
             "username": username,
             "email": email,
             "password": hash_password(user_data.password),  # 🔐 Secure
-            "created_at": datetime.now()
+            "created_at": datetime.now(timezone.utc)
         }
 
-        inserted_user = await users_collection.insert_one(user_doc)
+        # Insert only if neither username nor email is taken, in a single round trip.
+        # The unique indexes created in DatabaseService.connect cover concurrent signups.
+        try:
+            result = await users_collection.update_one(
+                {"$or": [{"email": email}, {"username": username}]},
+                {"$setOnInsert": user_doc},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            result = None
+
+        if result is None or result.upserted_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Username or email already registered."
+            )
 
         return {
             "message": "User registered successfully",
-            "user_id": str(inserted_user.inserted_id),
+            "user_id": str(result.upserted_id),
             "username": username,
             "email": email
         }
@@ -51,7 +59,7 @@ class AuthService:
         """
         users_collection = db_service.get_user_collection()
 
-        username = user_data.username.lower()
+        username = ascii_lower(user_data.username)
         user = await users_collection.find_one({"username": username})
 
         if not user or not verify_password(user_data.password, user["password"]):
@@ -72,7 +80,7 @@ class AuthService:
         Fetches a user from the database using ObjectId.
         """
         try:
-            user_obj_id = ObjectId(user_id)
+            user_obj_id = oid(user_id)
         except Exception:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -1,15 +1,22 @@
 # backend/services/chat_service.py
-from datetime import datetime
-from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+import json
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
 from fastapi import HTTPException, status
 from bson import ObjectId
+from pymongo import WriteConcern
 
 from langchain_core.messages import HumanMessage, AIMessage, ToolMessage, BaseMessage
 from langgraph.checkpoint.mongodb.aio import AsyncMongoDBSaver
 from langgraph.types import Command # Import Command for graph resumption
 from rag_pipeline.main_graph import create_tax_graph  # this should return your graph with checkpointer
 from services.database_service import db_service
+from utils.mongo_utils import oid
 from rag_pipeline.llm_setup import conversation_chain 
+from services.semantic_cache import SemanticCache
+from services.llm_cache import LLMCache, llm_cache
+from config.settings import settings
 
 from models.chat_message_model import (
     InitialTaxDetailsInput,
@@ -25,12 +32,18 @@ from services.database_service import db_service
 
 # Assuming main_graph is directly importable from rag_pipeline
 try:
-    from rag_pipeline.main_graph import create_tax_graph 
+    from rag_pipeline.main_graph import create_tax_graph, embedder
     print("LangGraph 'graph' imported successfully in chat_service.")
 except ImportError as e:
     print(f"Error importing LangGraph 'graph' in chat_service: {e}")
     raise ImportError(f"Missing LangGraph: {e}. Please ensure backend/rag_pipeline/main_graph.py exists and defines 'graph'.")
 
+# Bump when the graph's prompts or verdict format change so stale verdicts are not reused
+VERDICT_CACHE_VERSION = "v1"
+# Most recent sessions returned by the session list endpoint
+SESSION_LIST_LIMIT = 100
+# Bounds concurrent LLM work so bursts queue here instead of tripping Gemini rate limits
+LLM_SEM = asyncio.Semaphore(settings.LLM_CONCURRENCY)
 
 # --- Helper Function (from app.py) ---
 def process_graph_output(graph_state: Dict[str, Any]) -> Tuple[str, bool, Optional[str]]:
@@ -81,23 +94,56 @@ def process_graph_output(graph_state: Dict[str, Any]) -> Tuple[str, bool, Option
 
     return bot_response, awaiting_human_input, tool_call_id_for_resume
 
+def to_langchain_history(chat_history: List[Dict[str, Any]]) -> List[BaseMessage]:
+    """
+    Converts stored chat message dicts straight to LangChain's BaseMessage format for
+    conversation_chain, without validating each one through ChatMessage first.
+    """
+    lc_chat_history = []
+    for msg in chat_history:
+        role = msg.get("role")
+        if role == "user":
+            lc_chat_history.append(HumanMessage(content=msg["content"]))
+        elif role == "assistant":
+            lc_chat_history.append(AIMessage(content=msg["content"]))
+        # If you have ToolMessages in your history that conversation_chain might need, include them
+        elif role == "tool" and msg.get("tool_call_id") and msg.get("name"):
+            lc_chat_history.append(ToolMessage(content=msg["content"], tool_call_id=msg["tool_call_id"], name=msg["name"]))
+    return lc_chat_history
+
+def format_sse(payload: Dict[str, Any], event: Optional[str] = None) -> str:
+    """Formats one Server-Sent Event; the payload is JSON so newlines in tokens can't split the frame."""
+    frame = f"event: {event}\n" if event else ""
+    return f"{frame}data: {json.dumps(payload)}\n\n"
+
 class ChatService:
     graph_with_mongo = None  # LangGraph with checkpointing
+    semantic_cache = None  # Reuses answers to near-identical questions
 
     async def initialize(self):
         if not ChatService.graph_with_mongo:
             db = db_service.get_database()
             checkpointer = AsyncMongoDBSaver(db)
             ChatService.graph_with_mongo = create_tax_graph(checkpointer=checkpointer)
+        if not ChatService.semantic_cache:
+            ChatService.semantic_cache = SemanticCache(
+                embedder,
+                threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+                ttl_seconds=settings.SEMANTIC_CACHE_TTL_SECONDS
+            )
             
     async def get_user_chat_sessions(self, user_id: str) -> List[ChatSessionSummary]:
         """Retrieves all chat sessions for a given user."""
         sessions_collection = db_service.get_session_collection()
+        # Only the summary fields; chat_history and initial_tax_details can be large
+        cursor = sessions_collection.find(
+            {"user_id": oid(user_id)},
+            projection={"title": 1, "created_at": 1, "updated_at": 1}
+        ).sort("updated_at", -1).limit(SESSION_LIST_LIMIT)
+
         chats = []
-        async for session_doc in sessions_collection.find({"user_id": ObjectId(user_id)}).sort("updated_at", -1):
-            session_data = dict(session_doc)
-            session_data['id'] = str(session_data.pop('_id')) 
-            
+        for session_data in await cursor.to_list(length=SESSION_LIST_LIMIT):
+            session_data['id'] = str(session_data.pop('_id'))
             chats.append(ChatSessionSummary(**session_data))
         return chats
 
@@ -105,8 +151,8 @@ class ChatService:
         """Retrieves a specific chat session by ID for a given user."""
         sessions_collection = db_service.get_session_collection()
         
-        session_obj_id = ObjectId(session_id)
-        user_id_obj = ObjectId(user_id)
+        session_obj_id = oid(session_id)
+        user_id_obj = oid(user_id)
 
         session_doc = await sessions_collection.find_one({"_id": session_obj_id, "user_id": user_id_obj})
         if not session_doc:
@@ -131,10 +177,12 @@ class ChatService:
         Starts a new tax deduction chat session.
         Invokes LangGraph for initial analysis and uses the raw verdict as the assistant's message.
         """
+        now = datetime.now(timezone.utc)
         sessions_collection = db_service.get_session_collection()
-        user_id_obj = ObjectId(user_id)
+        user_id_obj = oid(user_id)
         # Generate a unique session ID for LangGraph's thread_id
-        session_id = str(ObjectId()) 
+        session_obj_id = ObjectId()
+        session_id = str(session_obj_id)
         config = {"configurable": {"thread_id": session_id}}
 
         print(f"[{session_id}] Invoking LangGraph for initial tax analysis...")
@@ -143,11 +191,26 @@ class ChatService:
             "messages": [HumanMessage(content="Calculate my tax deductions based on the provided details.")]
         }
         
-        # Use ainvoke: it runs until the graph finishes or interrupts
-        final_state = await ChatService.graph_with_mongo.ainvoke(initial_graph_input, config)
+        # Identical tax details yield the same verdict, so reuse it instead of re-running the graph
+        verdict_cache_key = LLMCache.cache_key({"user_details": input_data.user_details, "tmpl": VERDICT_CACHE_VERSION})
+        cached_verdict = await llm_cache.get(verdict_cache_key)
+        # Writes that don't affect the response; they're flushed alongside the session insert
+        pending_writes = []
+
+        if cached_verdict is not None:
+            print(f"[{session_id}] Verdict cache hit, skipping LangGraph run.")
+            bot_response, awaiting_human_input, tool_call_id = cached_verdict, False, None
+        else:
+            # Use ainvoke: it runs until the graph finishes or interrupts
+            async with LLM_SEM:
+                final_state = await ChatService.graph_with_mongo.ainvoke(initial_graph_input, config)
+
+            # Process the result of the graph run
+            bot_response, awaiting_human_input, tool_call_id = process_graph_output(final_state)
 
-        # Process the result of the graph run
-        bot_response, awaiting_human_input, tool_call_id = process_graph_output(final_state)
+            # Only completed verdicts are cached; interrupted runs depend on the graph checkpoint
+            if final_state.get("verdict") and not awaiting_human_input:
+                pending_writes.append(llm_cache.set(verdict_cache_key, bot_response, ttl=settings.LLM_CACHE_TTL_SECONDS))
 
         # Build chat history for the frontend
         chat_history = [
@@ -155,49 +218,55 @@ class ChatService:
             ChatMessage(role="assistant", content=bot_response, tool_call_id=tool_call_id)
         ]
 
-        current_time = datetime.now()
-        session_title = f"Tax Chat {current_time.strftime('%Y-%m-%d %H:%M')}"
+        session_title = f"Tax Chat {now.strftime('%Y-%m-%d %H:%M')} UTC"
             
         new_session = {
-            "_id": ObjectId(session_id), # Store as ObjectId
+            "_id": session_obj_id, # Store as ObjectId
             "user_id": user_id_obj,
             "title": session_title,
-            "created_at": current_time,
-            "updated_at": current_time,
+            "created_at": now,
+            "updated_at": now,
             "chat_history": [msg.model_dump() for msg in chat_history], # Store chat messages as dicts
             "initial_tax_details": input_data.user_details,
             "awaiting_human_input": awaiting_human_input, # Store the state
             "langgraph_thread_id": session_id # This links to the LangGraph checkpointer
         }
 
-        inserted_session = await sessions_collection.insert_one(new_session)
-        
-        print(f"[{session_id}] New session created. Awaiting Human Input: {awaiting_human_input}")
+        # The session ID is generated up front, so the writes can overlap building the response.
+        # w=1 acknowledges on the primary without waiting for majority replication.
+        write_task = asyncio.gather(
+            sessions_collection.with_options(write_concern=WriteConcern(w=1)).insert_one(new_session),
+            *pending_writes
+        )
 
-        return StartSessionResponse(
+        response = StartSessionResponse(
             message="New tax session started",
-            session_id=str(inserted_session.inserted_id),
+            session_id=session_id,
             bot_response=bot_response,
             chat_history=chat_history,
             awaiting_human_input=awaiting_human_input
         )
 
+        await write_task
+        print(f"[{session_id}] New session created. Awaiting Human Input: {awaiting_human_input}")
+
+        return response
+
     async def send_message_to_chat(self, session_id: str, input_data: ChatMessageInput, user_id: str) -> SendMessageResponse:
         """Sends a new message to an existing chat session and gets an LLM response."""
+        now = datetime.now(timezone.utc)
         sessions_collection = db_service.get_session_collection()
 
-        session_obj_id = ObjectId(session_id)
-        user_id_obj = ObjectId(user_id)
+        session_obj_id = oid(session_id)
+        user_id_obj = oid(user_id)
 
         session_doc = await sessions_collection.find_one({"_id": session_obj_id, "user_id": user_id_obj})
         if not session_doc:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chat session not found or unauthorized.")
         
-        # Convert chat_history list of dicts to list of ChatMessage Pydantic models
-        chat_history_messages = [ChatMessage(**msg) for msg in session_doc.get("chat_history", [])]
-        
+        # Stored messages stay as dicts; only the two new messages are built as ChatMessage models
+        stored_history = session_doc.get("chat_history", [])
         new_user_message = ChatMessage(role="user", content=input_data.message)
-        chat_history_messages.append(new_user_message)
 
         config = {"configurable": {"thread_id": session_id}} 
 
@@ -209,18 +278,17 @@ class ChatService:
             # Find the last AI message in chat history (excluding the current user's message)
             # that contained a tool_call (which would be the interruption for human assistance)
             last_ai_message_with_tool_call = None
-            # Iterate backwards, excluding the just-added user message
-            for msg in reversed(chat_history_messages[:-1]): 
+            for msg in reversed(stored_history):
                 # Check if it's an assistant message and has a tool_call_id indicating an interruption
-                if msg.role == "assistant" and msg.tool_call_id:
+                if msg.get("role") == "assistant" and msg.get("tool_call_id"):
                     last_ai_message_with_tool_call = msg
                     break
 
-            if not last_ai_message_with_tool_call or not last_ai_message_with_tool_call.tool_call_id:
+            if not last_ai_message_with_tool_call:
                 print(f"[{session_id}] Error: is_interruption_response is True but no active tool call found to respond to.")
                 raise HTTPException(status_code=400, detail="No active human assistance request found to respond to. Please start a new query or check your input.")
 
-            tool_call_id_to_resume = last_ai_message_with_tool_call.tool_call_id
+            tool_call_id_to_resume = last_ai_message_with_tool_call["tool_call_id"]
 
             # Create a ToolMessage. This is the user's answer to the interrupted tool call.
             tool_message_object = ToolMessage(
@@ -240,30 +308,35 @@ class ChatService:
             print(f"[{session_id}] Resuming graph with ToolMessage for tool_call_id: {tool_call_id_to_resume}")
             
             # Pass the resume_command to ainvoke
-            final_state = await ChatService.graph_with_mongo.ainvoke(
-                resume_command, 
-                config
-            )
+            async with LLM_SEM:
+                final_state = await ChatService.graph_with_mongo.ainvoke(
+                    resume_command,
+                    config
+                )
             
         else:
             # --- START OF MODIFIED CODE FOR NORMAL MESSAGES ---
             print(f"Generating chatbot response for session {session_id} using direct conversation_chain...")
             
-            # Convert chat_history_messages (ChatMessage models) to LangChain's BaseMessage format
-            lc_chat_history = []
-            for msg in chat_history_messages:
-                if msg.role == "user":
-                    lc_chat_history.append(HumanMessage(content=msg.content))
-                elif msg.role == "assistant":
-                    lc_chat_history.append(AIMessage(content=msg.content))
-                # If you have ToolMessages in your history that conversation_chain might need, include them
-                elif msg.role == "tool" and msg.tool_call_id and msg.name:
-                    lc_chat_history.append(ToolMessage(content=msg.content, tool_call_id=msg.tool_call_id, name=msg.name))
-            
-            # Call the direct conversation_chain
-            bot_response_content = (await conversation_chain.ainvoke(
-                {"chat_history": lc_chat_history, "user_input": input_data.message}
-            )).content
+            # Convert the stored chat history to LangChain's BaseMessage format.
+            # The new user message is included, as the prompt has always received it.
+            lc_chat_history = to_langchain_history(stored_history)
+            lc_chat_history.append(HumanMessage(content=input_data.message))
+
+            # Serve semantically equivalent questions in the same context from the cache
+            cache_key = SemanticCache.context_key(user_id, session_doc)
+            query_embedding = await ChatService.semantic_cache.embed(input_data.message)
+            bot_response_content = ChatService.semantic_cache.lookup(cache_key, query_embedding)
+
+            if bot_response_content is None:
+                # Call the direct conversation_chain
+                async with LLM_SEM:
+                    bot_response_content = (await conversation_chain.ainvoke(
+                        {"chat_history": lc_chat_history, "user_input": input_data.message}
+                    )).content
+                ChatService.semantic_cache.store(cache_key, query_embedding, bot_response_content)
+            else:
+                print(f"[{session_id}] Semantic cache hit, skipping LLM call.")
 
             # For direct LLM calls, interruption is not expected and there's no tool call ID
             awaiting_human_input = False
@@ -273,23 +346,128 @@ class ChatService:
             bot_response_content = final_state.get("verdict", "An unexpected error occurred. Please try again.")
         # Add the bot's response to the chat history
         new_bot_message = ChatMessage(role="assistant", content=bot_response_content, tool_call_id=tool_call_id)
-        chat_history_messages.append(new_bot_message)
 
+        # Append only the new turn instead of rewriting the whole history
         await sessions_collection.update_one(
             {"_id": session_obj_id},
-            {"$set": {
-                "chat_history": [msg.model_dump() for msg in chat_history_messages],
-                "updated_at": datetime.now(),
-                "awaiting_human_input": awaiting_human_input # Update the session's interruption status
-            }}
+            {
+                "$push": {"chat_history": {"$each": [new_user_message.model_dump(), new_bot_message.model_dump()]}},
+                "$set": {
+                    "updated_at": now,
+                    "awaiting_human_input": awaiting_human_input # Update the session's interruption status
+                }
+            }
         )
 
         print(f"Session {session_id} updated with new message. Awaiting Human Input: {awaiting_human_input}")
-        return SendMessageResponse(
+        # Stored messages were validated when they were written, so the response is built
+        # without re-validating the whole history on every turn
+        return SendMessageResponse.model_construct(
             message="Message sent",
             bot_response=bot_response_content,
-            updated_chat_history=chat_history_messages,
+            updated_chat_history=[ChatMessage.model_construct(**msg) for msg in stored_history]
+                + [new_user_message, new_bot_message],
             awaiting_human_input=awaiting_human_input,
             session_id=session_id
         )
+
+    async def stream_message_to_chat(self, session_id: str, input_data: ChatMessageInput, user_id: str) -> AsyncIterator[str]:
+        """
+        Sends a new message to an existing chat session and returns the LLM response as a
+        stream of Server-Sent Events. The turn is persisted once the stream completes.
+        The session is looked up before streaming starts so errors still surface as HTTP errors.
+        """
+        if input_data.is_interruption_response:
+            # Resuming the graph yields one verdict rather than a token stream
+            result = await self.send_message_to_chat(session_id, input_data, user_id)
+
+            async def single_event_stream():
+                yield format_sse({"token": result.bot_response})
+                yield format_sse({"awaiting_human_input": result.awaiting_human_input, "session_id": session_id}, event="done")
+
+            return single_event_stream()
+
+        now = datetime.now(timezone.utc)
+        sessions_collection = db_service.get_session_collection()
+        session_obj_id = oid(session_id)
+
+        session_doc = await sessions_collection.find_one({"_id": session_obj_id, "user_id": oid(user_id)})
+        if not session_doc:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chat session not found or unauthorized.")
+
+        stored_history = session_doc.get("chat_history", [])
+        # Same prompt shape as send_message_to_chat: history including the new user message
+        lc_chat_history = to_langchain_history(stored_history)
+        lc_chat_history.append(HumanMessage(content=input_data.message))
+        new_user_message = ChatMessage(role="user", content=input_data.message)
+
+        cache_key = SemanticCache.context_key(user_id, session_doc)
+
+        async def save_messages(messages: List[ChatMessage]):
+            await sessions_collection.update_one(
+                {"_id": session_obj_id},
+                {
+                    "$push": {"chat_history": {"$each": [msg.model_dump() for msg in messages]}},
+                    "$set": {"updated_at": now, "awaiting_human_input": False}
+                }
+            )
+
+        async def produce_tokens(token_q: asyncio.Queue):
+            # The permit bounds only the upstream LLM call. Tokens go into an unbounded queue,
+            # so a slow, stalled or disconnected SSE client never holds an LLM_SEM slot.
+            try:
+                async with LLM_SEM:
+                    async for chunk in conversation_chain.astream(
+                        {"chat_history": lc_chat_history, "user_input": input_data.message}
+                    ):
+                        if chunk.content:
+                            token_q.put_nowait(chunk.content)
+            finally:
+                token_q.put_nowait(None)
+
+        async def token_stream():
+            # The cache lookup runs alongside the LLM call instead of ahead of it, so a miss
+            # no longer pays for the embedding before the first token; a hit cancels the call
+            token_q = asyncio.Queue()
+            llm_task = asyncio.create_task(produce_tokens(token_q))
+            embed_task = asyncio.create_task(ChatService.semantic_cache.embed(input_data.message))
+            turn_saved = False
+            try:
+                query_embedding = await embed_task
+                cached_response = ChatService.semantic_cache.lookup(cache_key, query_embedding)
+                if cached_response is not None:
+                    llm_task.cancel()
+                    print(f"[{session_id}] Semantic cache hit, cancelled the LLM call.")
+                    bot_response_content = cached_response
+                    yield format_sse({"token": cached_response})
+                else:
+                    chunks = []
+                    while (token := await token_q.get()) is not None:
+                        chunks.append(token)
+                        yield format_sse({"token": token})
+                    await llm_task  # Re-raises if the upstream stream failed
+                    bot_response_content = "".join(chunks)
+                    ChatService.semantic_cache.store(cache_key, query_embedding, bot_response_content)
+
+                new_bot_message = ChatMessage(role="assistant", content=bot_response_content)
+                await save_messages([new_user_message, new_bot_message])
+                turn_saved = True
+                print(f"Session {session_id} updated with streamed message.")
+                yield format_sse({"awaiting_human_input": False, "session_id": session_id}, event="done")
+            except Exception as e:
+                print(f"[{session_id}] Streaming response failed: {e}")
+                yield format_sse({"detail": "The response could not be completed. Please try again."}, event="error")
+            finally:
+                # Also runs when the client disconnects and the generator is closed
+                llm_task.cancel()
+                embed_task.cancel()
+                if not turn_saved:
+                    # Keep the user's message even though no answer was stored for it
+                    try:
+                        await save_messages([new_user_message])
+                    except Exception as e:
+                        print(f"[{session_id}] Could not save the unanswered message: {e}")
+
+        return token_stream()
+
 chat_service = ChatService()
\ No newline at end of file
@@ -1,6 +1,7 @@
 # backend/services/database_service.py
 from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo.errors import ConnectionFailure, PyMongoError
+from pymongo.server_api import ServerApi
 from fastapi import HTTPException, status
 
 from config.settings import settings
@@ -17,7 +18,18 @@ class DatabaseService:
         """
         if cls._client is None:
             try:
-                cls._client = AsyncIOMotorClient(settings.MONGODB_URI)
+                cls._client = AsyncIOMotorClient(
+                    settings.MONGODB_URI,
+                    maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+                    minPoolSize=settings.MONGODB_MIN_POOL_SIZE,
+                    maxIdleTimeMS=settings.MONGODB_MAX_IDLE_TIME_MS,
+                    compressors=settings.MONGODB_COMPRESSORS,
+                    retryWrites=True,
+                    # Return stored datetimes as UTC-aware, matching what the services write
+                    tz_aware=True,
+                    # Pin the Stable API so server upgrades can't change command behaviour
+                    server_api=ServerApi("1")
+                )
                 cls._db = cls._client[settings.DB_NAME]
                 print("MongoDB connection successful (via DatabaseService)!")
             except ConnectionFailure as e:
@@ -42,7 +54,31 @@ class DatabaseService:
         except Exception as e:
             print(f"MongoDB startup connection check failed: {e}")
             # Do not raise here, allow app to start, but future requests will fail
-            pass
+            return
+
+        # Each index is created on its own, so one failure can't block the others
+        users = cls.get_user_collection()
+        # Signup relies on these to reject duplicates without a separate lookup
+        for field in ("username", "email"):
+            await cls._ensure_index(
+                users, field, unique=True,
+                on_failure=f"existing users may share a {field}; signup is NOT protected against duplicate {field}s until they are resolved"
+            )
+        # Serves the per-user session list sorted by most recent activity.
+        # Lookups by {_id, user_id} are already served by the unique _id index.
+        await cls._ensure_index(cls.get_session_collection(), [("user_id", 1), ("updated_at", -1)])
+        # Let MongoDB drop expired LLM cache entries
+        await cls._ensure_index(cls.get_llm_cache_collection(), "expires_at", expireAfterSeconds=0)
+
+    @classmethod
+    async def _ensure_index(cls, collection, keys, on_failure=None, **kwargs):
+        """Creates one index, logging (not raising) if it can't be built."""
+        try:
+            await collection.create_index(keys, **kwargs)
+        except Exception as e:
+            print(f"MongoDB index {keys!r} on '{collection.name}' could not be created: {e}")
+            if on_failure:
+                print(f"  -> {on_failure}")
 
     @classmethod
     async def disconnect(cls):
@@ -61,5 +97,10 @@ class DatabaseService:
         """Returns the sessions collection."""
         return cls.get_database()["sessions"]
 
+    @classmethod
+    def get_llm_cache_collection(cls):
+        """Returns the exact-match LLM response cache collection."""
+        return cls.get_database()["llm_exact_cache"]
+
 # Instantiate the service to be used as a singleton
 db_service = DatabaseService()
\ No newline at end of file
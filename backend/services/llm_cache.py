@@ -0,0 +1,40 @@
+# backend/services/llm_cache.py
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from services.database_service import db_service
+
+
+class LLMCache:
+    """
+    Exact-match cache for LLM outputs that are deterministic for a given input,
+    stored in MongoDB and expired by a TTL index on 'expires_at'.
+    """
+
+    @staticmethod
+    def cache_key(payload: Dict[str, Any]) -> str:
+        """SHA-256 of the canonical JSON form of the cache inputs."""
+        canonical = json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        """Returns the cached response for a key, or None on a miss or expired entry."""
+        cache_collection = db_service.get_llm_cache_collection()
+        cached = await cache_collection.find_one(
+            {"_id": key, "expires_at": {"$gt": datetime.now(timezone.utc)}},
+            projection={"response": 1}
+        )
+        return cached["response"] if cached else None
+
+    async def set(self, key: str, response: str, ttl: int = 86400) -> None:
+        """Stores a response for `ttl` seconds."""
+        cache_collection = db_service.get_llm_cache_collection()
+        await cache_collection.update_one(
+            {"_id": key},
+            {"$set": {"response": response, "expires_at": datetime.now(timezone.utc) + timedelta(seconds=ttl)}},
+            upsert=True
+        )
+
+llm_cache = LLMCache()
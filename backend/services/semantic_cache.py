@@ -0,0 +1,82 @@
+# backend/services/semantic_cache.py
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class SemanticCache:
+    """
+    In-process cache of chatbot answers keyed by the embedding of the user's question.
+
+    Entries are bucketed by user and by a hash of the session's initial tax details, so
+    an answer is only reused for the same user asking about the same tax situation,
+    and paraphrased follow-ups later in a session can still hit.
+    Within a bucket, a question hits when its cosine similarity to a cached question
+    is at least `threshold`.
+    """
+
+    def __init__(self, embedder, threshold: float = 0.92, ttl_seconds: int = 3600,
+                 max_entries_per_key: int = 64, max_keys: int = 4096):
+        self.embedder = embedder
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries_per_key = max_entries_per_key
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, List[Tuple[np.ndarray, str, float]]]" = OrderedDict()
+
+    @staticmethod
+    def context_key(user_id: str, session_doc: Dict[str, Any]) -> str:
+        """
+        Builds the bucket key from the user ID and the session's initial tax details.
+        Sessions without stored details fall back to their own ID, so they never share answers.
+        """
+        tax_details = session_doc.get("initial_tax_details")
+        if tax_details is None:
+            context = f"session:{session_doc['_id']}"
+        else:
+            # The verdict depends only on these details, so it is the stable part of the context
+            context = json.dumps(tax_details, sort_keys=True, default=str)
+        return f"{user_id}:{hashlib.sha256(context.encode('utf-8')).hexdigest()[:16]}"
+
+    async def embed(self, text: str) -> Optional[np.ndarray]:
+        """Returns the L2-normalized query embedding, or None if embedding fails."""
+        try:
+            vector = np.asarray(await self.embedder.aembed_query(text), dtype=np.float32)
+        except Exception as e:
+            print(f"Semantic cache embedding failed, bypassing cache: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def lookup(self, key: str, query_embedding: Optional[np.ndarray]) -> Optional[str]:
+        """Returns the cached answer most similar to the query if it clears the threshold."""
+        if query_embedding is None or key not in self._buckets:
+            return None
+
+        cutoff = time.monotonic() - self.ttl_seconds
+        entries = [entry for entry in self._buckets[key] if entry[2] >= cutoff]
+        if not entries:
+            del self._buckets[key]
+            return None
+        self._buckets[key] = entries
+        self._buckets.move_to_end(key)
+
+        scores = np.stack([entry[0] for entry in entries]) @ query_embedding
+        best = int(np.argmax(scores))
+        return entries[best][1] if scores[best] >= self.threshold else None
+
+    def store(self, key: str, query_embedding: Optional[np.ndarray], response: str) -> None:
+        """Caches an answer under the given context key."""
+        if query_embedding is None:
+            return
+
+        entries = self._buckets.setdefault(key, [])
+        entries.append((query_embedding, response, time.monotonic()))
+        del entries[:-self.max_entries_per_key]
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
@@ -0,0 +1,8 @@
+from functools import lru_cache
+
+from bson import ObjectId
+
+@lru_cache(maxsize=2048)
+def oid(value: str) -> ObjectId:
+    # The same user/session IDs recur on every request; invalid IDs still raise InvalidId
+    return ObjectId(value)
@@ -0,0 +1,13 @@
+import string
+
+_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+_TRUE_SET = frozenset({"true", "1", "yes"})
+
+def ascii_lower(value: str) -> str:
+    # str.translate skips Unicode case folding; non-ASCII input keeps str.lower() semantics
+    return value.translate(_LOWER) if value.isascii() else value.lower()
+
+def to_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return ascii_lower(str(value)) in _TRUE_SET
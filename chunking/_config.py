@@ -0,0 +1,33 @@
+import os
+from functools import lru_cache
+
+from dotenv import load_dotenv
+from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from qdrant_client import QdrantClient
+
+# Loaded on import so every module that reads settings (e.g. OCR_CONCURRENCY) sees .env
+load_dotenv()
+
+# ─── CONFIGURATION ─────────────────────────────────────────────────────────
+QDRANT_URL = os.getenv("QDRANT_URL")
+QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
+EMBEDDING_MODEL = "models/text-embedding-004"
+
+
+def require_google_api_key():
+    """Fails fast before any ingestion work when the Gemini key is missing."""
+    if not os.getenv("GOOGLE_API_KEY"):
+        raise ValueError("GOOGLE_API_KEY environment variable not set. Check your .env file.")
+
+
+# ─── SHARED CLIENTS ────────────────────────────────────────────────────────
+# Cached per process, so several ingestion runs in one process share credentials and channels
+@lru_cache(maxsize=None)
+def get_embedder():
+    return GoogleGenerativeAIEmbeddings(model=EMBEDDING_MODEL)
+
+
+@lru_cache(maxsize=None)
+def get_qdrant():
+    # gRPC sends vectors as protobuf floats instead of JSON text
+    return QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY, prefer_grpc=True)
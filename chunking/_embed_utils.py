@@ -0,0 +1,119 @@
+import hashlib
+import uuid
+
+from qdrant_client.models import (
+    Distance,
+    Filter,
+    FilterSelector,
+    IsEmptyCondition,
+    PayloadField,
+    PointStruct,
+    SetPayload,
+    SetPayloadOperation,
+    VectorParams,
+)
+
+# ─── CONFIGURATION ─────────────────────────────────────────────────────────
+EMBED_BATCH_SIZE = 100  # max texts per Gemini batchEmbedContents request
+EMBED_CONCURRENCY = 5  # embedding batches in flight at once
+RETRIEVE_BATCH_SIZE = 1000  # point IDs per Qdrant retrieve request
+UPSERT_BATCH_SIZE = 1000  # points per Qdrant upsert request
+
+# Points ingested before IDs were content hashes have random IDs and no content_hash,
+# so re-ingesting writes a second copy of each chunk next to them
+LEGACY_POINTS_FILTER = Filter(must=[IsEmptyCondition(is_empty=PayloadField(key="metadata.content_hash"))])
+
+
+# ─── CONTENT HASHING ───────────────────────────────────────────────────────
+def content_hash(text):
+    """16-byte blake2b digest of chunk text, hex-encoded so it fits in a JSON payload."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def point_id(digest):
+    """Deterministic Qdrant point ID for a content hash, so re-ingesting a chunk overwrites it."""
+    return str(uuid.UUID(hex=digest))
+
+
+# ─── COLLECTION HELPERS ────────────────────────────────────────────────────
+def drop_stored(client, collection_name, chunks):
+    """
+    Drops chunks whose hash-keyed point is already in the collection, since a
+    previous run embedded them. Chunks must carry metadata["content_hash"].
+
+    IDs only cover the text, so a stored point whose metadata has since changed
+    (new tagging rules, corrected page numbers) gets the new metadata written in
+    place; only the vector is reused.
+    """
+    ids = [point_id(c.metadata["content_hash"]) for c in chunks]
+    by_id = dict(zip(ids, chunks))
+    stored = set()
+    refreshes = []
+    for i in range(0, len(ids), RETRIEVE_BATCH_SIZE):
+        records = client.retrieve(
+            collection_name=collection_name,
+            ids=ids[i:i + RETRIEVE_BATCH_SIZE],
+            with_payload=["metadata"],
+            with_vectors=False
+        )
+        for record in records:
+            pid = str(record.id)
+            stored.add(pid)
+            metadata = by_id[pid].metadata
+            if (record.payload or {}).get("metadata") != metadata:
+                refreshes.append(SetPayloadOperation(set_payload=SetPayload(payload={"metadata": metadata}, points=[pid])))
+    if refreshes:
+        client.batch_update_points(collection_name=collection_name, update_operations=refreshes, wait=True)
+        print(f"✓ Refreshed metadata on {len(refreshes)} stored points in '{collection_name}'")
+    return [c for c, pid in zip(chunks, ids) if pid not in stored]
+
+
+def create_collection(client, collection_name, vector_size):
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE)
+    )
+
+
+def drop_legacy_points(client, collection_name):
+    """
+    One-time migration for collections ingested before hash-keyed point IDs. Call it
+    only after a successful full re-ingest, so every legacy point already has its
+    hash-keyed replacement; later runs find nothing to delete.
+    """
+    legacy = client.count(collection_name=collection_name, count_filter=LEGACY_POINTS_FILTER, exact=True).count
+    if legacy:
+        client.delete(
+            collection_name=collection_name,
+            points_selector=FilterSelector(filter=LEGACY_POINTS_FILTER),
+            wait=True
+        )
+        print(f"✓ Removed {legacy} legacy random-ID points from '{collection_name}'")
+    return legacy
+
+
+async def adrop_legacy_points(client, collection_name):
+    """drop_legacy_points for an AsyncQdrantClient."""
+    legacy = (await client.count(
+        collection_name=collection_name, count_filter=LEGACY_POINTS_FILTER, exact=True
+    )).count
+    if legacy:
+        await client.delete(
+            collection_name=collection_name,
+            points_selector=FilterSelector(filter=LEGACY_POINTS_FILTER),
+            wait=True
+        )
+        print(f"✓ Removed {legacy} legacy random-ID points from '{collection_name}'")
+    return legacy
+
+
+def to_points(chunks, embeddings):
+    # Same payload layout as QdrantVectorStore so the backend retrievers can read these points
+    return [
+        PointStruct(
+            id=point_id(chunk.metadata["content_hash"]),
+            vector=emb,
+            payload={"page_content": chunk.page_content, "metadata": chunk.metadata}
+        )
+        for chunk, emb in zip(chunks, embeddings)
+    ]
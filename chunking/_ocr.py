@@ -0,0 +1,90 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import fitz  # PyMuPDF
+import pytesseract
+from PIL import Image
+
+# Imported for its side effect of loading .env, so the settings below see it
+# regardless of what the calling script imported first
+import _config  # noqa: F401
+from _ocr_cache import file_digest, load_pages, save_pages
+
+# ─── CONFIGURATION ─────────────────────────────────────────────────────────
+# Tesseract is CPU-bound, so more workers than cores only adds contention
+OCR_CONCURRENCY = int(os.getenv("OCR_CONCURRENCY", str(os.cpu_count())))
+# Render resolution for OCR; fitz's 72 dpi default is too coarse for small print
+OCR_DPI = int(os.getenv("OCR_DPI", "200"))
+# Parallelism comes from the page-level process pool, so each Tesseract run stays
+# single-threaded; OpenMP threads on top of one worker per core only oversubscribe
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+# Worker pools are started from pipeline threads while other threads (gRPC, the
+# embed pool) are running, where fork can deadlock; spawn starts clean processes.
+# Scripts guard their entry points with __main__, so workers can re-import them.
+MP_CONTEXT = multiprocessing.get_context("spawn")
+
+
+# ─── PAGE OCR ──────────────────────────────────────────────────────────────
+def page_tasks(file_path):
+    """Returns one (pdf_path, page_index) task per page of a PDF."""
+    with fitz.open(str(file_path)) as doc:
+        return [(str(file_path), i) for i in range(doc.page_count)]
+
+
+def ocr_page(task):
+    """
+    OCRs one PDF page inside a worker process.
+    Takes (pdf_path, page_index) since fitz pages can't be pickled.
+    """
+    file_path, page_index = task
+    with fitz.open(file_path) as doc:
+        # Grayscale keeps the pixmap at one byte per pixel, which Tesseract prefers anyway
+        pix = doc[page_index].get_pixmap(dpi=OCR_DPI, colorspace=fitz.csGRAY)
+    # Wraps the pixmap's buffer instead of copying it; pix outlives the OCR call
+    img = Image.frombuffer("L", (pix.width, pix.height), pix.samples_mv, "raw", "L", pix.stride, 1)
+    return pytesseract.image_to_string(img)
+
+
+def ocr_files(file_paths, page_fn=ocr_page, cache_name="tesseract"):
+    """
+    OCRs every page of several PDFs in one worker pool, reusing the cached text of
+    files whose bytes haven't changed. Yields (file_path, page_index, text) as pages
+    finish, cached files first and the rest in file/page order.
+
+    page_fn: module-level (picklable) function run per (pdf_path, page_index) task;
+    give a different cache_name when it can produce different text than ocr_page.
+    """
+    # Render settings change the output, so they are part of the cache key
+    tag = f"{cache_name}-{OCR_DPI}dpi"
+    tasks = []
+    digests = {}  # hashed once per file and reused when its pages are saved
+
+    for file_path in file_paths:
+        digests[file_path] = file_digest(file_path)
+        cached = load_pages(digests[file_path], tag)
+        if cached is not None:
+            print(f"✓ OCR cache hit: {Path(file_path).name}")
+            for i, text in enumerate(cached):
+                yield file_path, i, text
+        else:
+            tasks.extend((file_path, i) for _, i in page_tasks(file_path))
+
+    if not tasks:
+        return
+
+    current_file, texts = None, []
+    with ProcessPoolExecutor(max_workers=OCR_CONCURRENCY, mp_context=MP_CONTEXT) as executor:
+        # map() yields in task order as soon as each page is done, so downstream
+        # stages can start before the whole file is OCR'd
+        worker_tasks = [(str(file_path), i) for file_path, i in tasks]
+        for (file_path, i), text in zip(tasks, executor.map(page_fn, worker_tasks, chunksize=4)):
+            if file_path != current_file:
+                if texts:
+                    save_pages(digests[current_file], tag, texts)
+                current_file, texts = file_path, []
+            texts.append(text)
+            yield file_path, i, text
+    if texts:
+        save_pages(digests[current_file], tag, texts)
@@ -0,0 +1,180 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain.schema import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from _config import get_embedder, get_qdrant
+from _embed_utils import (
+    EMBED_BATCH_SIZE,
+    EMBED_CONCURRENCY,
+    UPSERT_BATCH_SIZE,
+    content_hash,
+    create_collection,
+    drop_legacy_points,
+    drop_stored,
+    to_points,
+)
+
+# ─── CONFIGURATION ─────────────────────────────────────────────────────────
+QUEUE_SIZE = 32  # items buffered between stages before the upstream stage blocks
+FLUSH_TIMEOUT = 2.0  # seconds a partial embedding batch may wait before it is sent anyway
+
+_DONE = object()
+
+
+# ─── STAGES ────────────────────────────────────────────────────────────────
+def _stage(target, errors, out_q):
+    """Runs one stage in a thread; whatever happens, downstream gets the end-of-stream marker."""
+    def run():
+        try:
+            target()
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            out_q.put(_DONE)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def _drain(in_q):
+    """Iterates a queue until the end-of-stream marker."""
+    while True:
+        item = in_q.get()
+        if item is _DONE:
+            return
+        yield item
+
+
+# ─── PIPELINE ──────────────────────────────────────────────────────────────
+def run_pipeline(doc_iter, metadata_fn, collection_name, splitter=None, embedder=None, client=None):
+    """
+    Streams documents through load → chunk + tag → embed + upsert, so OCR/parsing,
+    splitting and embedding I/O overlap instead of running one after another.
+
+    doc_iter: iterable of page/section Documents, consumed lazily in its own thread
+    metadata_fn: called on every chunk to tag its metadata in place
+    Embedding batches are flushed at EMBED_BATCH_SIZE chunks or after FLUSH_TIMEOUT
+    seconds, with up to EMBED_CONCURRENCY in flight. Duplicate texts and chunks
+    already stored by a previous run are skipped. Returns the number of points written.
+
+    This is the shared embed-and-upsert path for the LangChain-embedded scripts (ITR-1,
+    amended rules, case laws, law, rules); it took over from batch_embed_and_upsert.
+    """
+    splitter = splitter or RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=150)
+    embedder = embedder or get_embedder()
+    client = client or get_qdrant()
+
+    docs_q = queue.Queue(maxsize=QUEUE_SIZE)
+    chunks_q = queue.Queue(maxsize=QUEUE_SIZE)
+    errors = []
+
+    def load():
+        for doc in doc_iter:
+            docs_q.put(doc)
+
+    def chunk():
+        seen = set()
+        for doc in _drain(docs_q):
+            # Pages are split one at a time and dropped once their chunks are queued,
+            # so no stage ever holds the whole document set
+            for text in splitter.split_text(doc.page_content):
+                digest = content_hash(text)
+                if digest in seen:
+                    continue
+                seen.add(digest)
+                piece = Document(page_content=text, metadata={**doc.metadata, "content_hash": digest})
+                metadata_fn(piece)
+                chunks_q.put(piece)
+
+    threads = [_stage(load, errors, docs_q), _stage(chunk, errors, chunks_q)]
+
+    collection_ready = client.collection_exists(collection_name)
+    collection_lock = threading.Lock()
+    # Caps batches waiting on the executor, so a slow embedder backs up into the queues
+    in_flight = threading.BoundedSemaphore(EMBED_CONCURRENCY * 2)
+    # Embedded points collect here and go out in UPSERT_BATCH_SIZE slabs with wait=False.
+    # The buffer never drains completely, so the final wait=True upsert below is always
+    # sent; Qdrant applies updates in order, which makes it a barrier for every slab.
+    pending_points = []
+    pending_lock = threading.Lock()
+
+    def embed_and_upsert(batch):
+        nonlocal collection_ready
+        try:
+            if collection_ready:
+                batch = drop_stored(client, collection_name, batch)
+                if not batch:
+                    return 0
+            embeddings = embedder.embed_documents([c.page_content for c in batch])
+            with collection_lock:
+                if not collection_ready:
+                    create_collection(client, collection_name, len(embeddings[0]))
+                    collection_ready = True
+            slabs = []
+            with pending_lock:
+                pending_points.extend(to_points(batch, embeddings))
+                while len(pending_points) > UPSERT_BATCH_SIZE:
+                    slabs.append(pending_points[:UPSERT_BATCH_SIZE])
+                    del pending_points[:UPSERT_BATCH_SIZE]
+            for slab in slabs:
+                client.upsert(collection_name=collection_name, points=slab, wait=False)
+            return len(batch)
+        finally:
+            in_flight.release()
+
+    # Embedding concurrency comes from worker threads rather than aembed_documents under
+    # asyncio.gather: the lru-cached embedder's async client binds to the first event loop
+    # it runs on, and the pipeline's stages are threads, not coroutines
+    futures = []
+    with ThreadPoolExecutor(max_workers=EMBED_CONCURRENCY) as executor:
+        def flush(batch):
+            in_flight.acquire()
+            futures.append(executor.submit(embed_and_upsert, batch))
+
+        batch = []
+        first_enqueue_ts = None
+        while True:
+            timeout = None
+            if batch:
+                timeout = max(0.0, FLUSH_TIMEOUT - (time.monotonic() - first_enqueue_ts))
+            try:
+                item = chunks_q.get(timeout=timeout)
+            except queue.Empty:
+                # Batch-or-timeout: a trickle of chunks still reaches the embedder promptly
+                flush(batch)
+                batch = []
+                continue
+
+            if item is _DONE:
+                break
+            if not batch:
+                first_enqueue_ts = time.monotonic()
+            batch.append(item)
+            if len(batch) >= EMBED_BATCH_SIZE:
+                flush(batch)
+                batch = []
+
+        if batch:
+            flush(batch)
+
+    # A failed stage has already ended the stream; raising first avoids joining a
+    # loader that may be blocked on a queue nobody drains any more
+    if errors:
+        raise errors[0]
+    for thread in threads:
+        thread.join()
+
+    written = sum(f.result() for f in futures)
+    if pending_points:
+        client.upsert(collection_name=collection_name, points=pending_points, wait=True)
+    print(f"✓ Pipelined {written} new chunks into '{collection_name}'")
+
+    # Every chunk now has a hash-keyed point, so pre-migration copies are redundant
+    if collection_ready:
+        drop_legacy_points(client, collection_name)
+    return written
@@ -0,0 +1,39 @@
+# ─── HEADER-BASED BLOCK SPLITTING ──────────────────────────────────────────
+def _close_block(body_parts, min_body_len):
+    """Joins a block's page slices the same way the pages are joined; None if too short."""
+    body = "\n".join(body_parts).strip()
+    return body if len(body) >= min_body_len else None
+
+
+def split_by_header(pages, header_re, min_body_len=30):
+    """
+    Splits page texts into blocks at every header_re match without concatenating
+    the whole document. Blocks may span pages; each slice is only joined when its
+    block closes.
+
+    pages: iterable of (page_number, text)
+    header_re: compiled pattern whose group(1) is the block ID (e.g. "80C")
+    Yields (block_id, body, page_number) with the page the header appears on.
+    """
+    current_id = None
+    current_page = None
+    body_parts = []
+
+    for page_no, text in pages:
+        pos = 0
+        for match in header_re.finditer(text):
+            body_parts.append(text[pos:match.start()])
+            if current_id is not None:
+                body = _close_block(body_parts, min_body_len)
+                if body:
+                    yield current_id, body, current_page
+            current_id = match.group(1).upper()
+            current_page = page_no
+            body_parts = []
+            pos = match.end()
+        body_parts.append(text[pos:])
+
+    if current_id is not None:
+        body = _close_block(body_parts, min_body_len)
+        if body:
+            yield current_id, body, current_page
@@ -2,6 +2,8 @@ import os
 import re
 import requests
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from langchain_community.document_loaders import BSHTMLLoader
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
@@ -10,6 +12,49 @@ from reportlab.lib.units import inch
 from reportlab.lib import colors
 from datetime import datetime
 
+# Compiled once; the whitespace pattern runs for every extracted tag
+CONTENT_CLASS_RE = re.compile(r'(content|post|blog|entry)', re.I)
+WHITESPACE_RE = re.compile(r'\s+')
+TITLE_STRIP_RE = re.compile(r'[^\w\s-]')
+SLUG_SEPARATOR_RE = re.compile(r'[-\s]+')
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Cache-Control': 'max-age=0'
+}
+REQUEST_TIMEOUT = 30  # seconds
+
+# One pooled session per process, so scraping several URLs reuses TCP/TLS connections
+_SESSION = requests.Session()
+_SESSION.headers.update(HEADERS)
+_adapter = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+)
+_SESSION.mount("https://", _adapter)
+_SESSION.mount("http://", _adapter)
+
+# PDF styles are fixed, so they are built once instead of per scraped element
+STYLES = getSampleStyleSheet()
+TITLE_STYLE = ParagraphStyle('TitleStyle', parent=STYLES['Heading1'], fontSize=16, textColor=colors.darkblue, spaceAfter=0.3 * inch)
+BODY_STYLE = ParagraphStyle('BodyStyle', parent=STYLES['Normal'], fontSize=11, leading=14, spaceBefore=0.1 * inch, spaceAfter=0.1 * inch)
+BULLET_STYLE = ParagraphStyle('BulletStyle', parent=STYLES['Normal'], fontSize=11, leading=14, leftIndent=12, bulletIndent=0)
+CODE_STYLE = ParagraphStyle('CodeStyle', parent=STYLES['Code'], fontSize=9, leading=12, leftIndent=12)
+HEADING_STYLES = {
+    f'h{level}': ParagraphStyle(
+        f'Heading{level}',
+        parent=STYLES.get(f'Heading{min(level, 3)}', STYLES['Heading3']),
+        fontSize=14 - (level - 1),
+        spaceBefore=0.2 * inch,
+        spaceAfter=0.1 * inch
+    )
+    for level in range(1, 7)
+}
 
 def scrape_blog_to_pdf(url, output_dir="data", filename=None):
     """
@@ -27,23 +72,19 @@ def scrape_blog_to_pdf(url, output_dir="data", filename=None):
     
     
     try:
-        headers = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-    'Accept-Language': 'en-US,en;q=0.5',
-    'Connection': 'keep-alive',
-    'Upgrade-Insecure-Requests': '1',
-    'Cache-Control': 'max-age=0'
-}
-        response = requests.get(url)
+        response = _SESSION.get(url, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
 
-        # Parse HTML using BeautifulSoup
-        soup = BeautifulSoup(response.content, 'html5lib')
+        # Parse HTML with lxml's C parser; html5lib is kept as a lenient fallback
+        try:
+            soup = BeautifulSoup(response.content, 'lxml')
+        except Exception:
+            soup = BeautifulSoup(response.content, 'html5lib')
 
-       # Remove unwanted elements
-        for selector in ['header', 'footer', 'nav', 'aside', 'script', 'style']:
-            for tag in soup.select(selector):
+        # Remove unwanted elements in a single CSS pass; nested matches are already
+        # gone with their ancestor
+        for tag in soup.select('header, footer, nav, aside, script, style'):
+            if not tag.decomposed:
                 tag.decompose()
 
         # Extract blog title
@@ -53,7 +94,7 @@ def scrape_blog_to_pdf(url, output_dir="data", filename=None):
         main_content = (
             soup.find('article') or
             soup.find('main') or
-            soup.find('div', class_=re.compile(r'(content|post|blog|entry)', re.I)) or
+            soup.find('div', class_=CONTENT_CLASS_RE) or
             soup.body
         )
 
@@ -64,12 +105,12 @@ def scrape_blog_to_pdf(url, output_dir="data", filename=None):
             for tag in main_content.find_all(tags, recursive=True):
                 text = tag.get_text(strip=True)
                 if text:
-                    elements.append((tag.name, re.sub(r'\s+', ' ', text)))
+                    elements.append((tag.name, WHITESPACE_RE.sub(' ', text)))
 
         # Generate filename if not provided
         if not filename:
-            clean_title = re.sub(r'[^\w\s-]', '', title).strip().lower()
-            clean_title = re.sub(r'[-\s]+', '-', clean_title)
+            clean_title = TITLE_STRIP_RE.sub('', title).strip().lower()
+            clean_title = SLUG_SEPARATOR_RE.sub('-', clean_title)
             date_str = datetime.now().strftime("%Y%m%d")
             filename = f"{clean_title}-{date_str}.pdf"
 
@@ -78,38 +119,23 @@ def scrape_blog_to_pdf(url, output_dir="data", filename=None):
 
         pdf_path = os.path.join(output_dir, filename)
 
-        # Define PDF styles
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle('TitleStyle', parent=styles['Heading1'], fontSize=16, textColor=colors.darkblue, spaceAfter=0.3 * inch)
-        body_style = ParagraphStyle('BodyStyle', parent=styles['Normal'], fontSize=11, leading=14, spaceBefore=0.1 * inch, spaceAfter=0.1 * inch)
-        bullet_style = ParagraphStyle('BulletStyle', parent=styles['Normal'], fontSize=11, leading=14, leftIndent=12, bulletIndent=0)
-
         # Build PDF content
-        pdf_content = [Paragraph(title, title_style), Spacer(1, 0.2 * inch)]
-        pdf_content.append(Paragraph(f"Source: {url}", styles['Italic']))
+        pdf_content = [Paragraph(title, TITLE_STYLE), Spacer(1, 0.2 * inch)]
+        pdf_content.append(Paragraph(f"Source: {url}", STYLES['Italic']))
         pdf_content.append(Spacer(1, 0.1 * inch))
-        pdf_content.append(Paragraph(f"Scraped on: {datetime.now().strftime('%B %d, %Y')}", styles['Italic']))
+        pdf_content.append(Paragraph(f"Scraped on: {datetime.now().strftime('%B %d, %Y')}", STYLES['Italic']))
         pdf_content.append(Spacer(1, 0.3 * inch))
 
         for tag, para in elements:
-            if tag.startswith('h') and tag[1:].isdigit():
-                level = int(tag[1:])
-                heading_style = ParagraphStyle(
-                    f'Heading{level}',
-                    parent=styles.get(f'Heading{min(level, 3)}', styles['Heading3']),
-                    fontSize=14 - (level - 1),
-                    spaceBefore=0.2 * inch,
-                    spaceAfter=0.1 * inch
-                )
-                pdf_content.append(Paragraph(para, heading_style))
-            elif tag == 'li':
-                pdf_content.append(Paragraph(f"• {para}", bullet_style))
-            elif tag in ['pre', 'code']:
-                code_style = ParagraphStyle('CodeStyle', parent=styles['Code'], fontSize=9, leading=12, leftIndent=12)
-                pdf_content.append(Paragraph(para.replace(' ', '&nbsp;').replace('\n', '<br />'), code_style))
-            else:
-                pdf_content.append(Paragraph(para, body_style))
-
+            style = HEADING_STYLES.get(tag)
+            if style is None:
+                if tag == 'li':
+                    style, para = BULLET_STYLE, f"• {para}"
+                elif tag in ('pre', 'code'):
+                    style, para = CODE_STYLE, para.replace(' ', '&nbsp;').replace('\n', '<br />')
+                else:
+                    style = BODY_STYLE
+            pdf_content.append(Paragraph(para, style))
             pdf_content.append(Spacer(1, 0.1 * inch))
 
         # Write PDF